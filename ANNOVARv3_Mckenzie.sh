@@ -46,6 +46,7 @@ echo "# $0 A script to annotate variants using ANNOVAR
 # 11/06/2019; Ali Gardner; Updated some databases in Annovar
 # 15/06/2020; Ali Gardner; Updated Clinvar, ID & Epilepsy lists
 # 01/09/2020; Ali Gardner; Added SplicAI data, Mackenzie & 5'UTR genes
+# 19/10/2026; Mark Corbett; Run annovar_combine_csv.py through vatk.py
 " 
 }
 
@@ -118,7 +119,7 @@ perl $AnnovarPATH/annotate_variation.pl -regionanno -buildver $BUILD -dbtype RVI
 perl $AnnovarPATH/annotate_variation.pl -regionanno -buildver $BUILD -dbtype GDIScores --colsWanted 4,5,6,7 $AV_INPUT $AV_DB >> $1.pipeline.log 2>&1
 
 # Combine all variant files
-python $SCRIPTPATH/annovar_combine_csv.py $AV_INPUT $AV_INPUT.$BUILD* > $AV_INPUT.combo.csv
+python $SCRIPTPATH/vatk.py combine $AV_INPUT $AV_INPUT.$BUILD* > $AV_INPUT.combo.csv
 #perl $SCRIPTPATH/vcfCSVFix.pl $AV_INPUT.combo.csv > $AV_INPUT.combo.txt
 
 # Create genome summary combo file
@@ -46,6 +46,7 @@ echo "# $0 A script to annotate variants using ANNOVAR
 # 11/06/2019; Ali Gardner; Updated some databases in Annovar
 # 02/06/2020; Ali Gardner; Updated for use with hg38 vcfs
 # 26/02/2025; Mark Corbett; Bring changes made to other test / draft scripts to this script
+# 19/10/2026; Mark Corbett; Run annovar_combine_csv.py through vatk.py
 " 
 }
 
@@ -127,7 +128,7 @@ perl $AnnovarPATH/annotate_variation.pl -regionanno -buildver $BUILD -dbtype pLI
 perl $AnnovarPATH/annotate_variation.pl -regionanno -buildver $BUILD -dbtype Zscore --colsWanted 4 $AV_INPUT $AV_DB >> $1.pipeline.log 2>&1
 
 # Combine all variant files
-python $SCRIPTPATH/annovar_combine_csv.py $AV_INPUT $AV_INPUT.$BUILD* > $AV_INPUT.combo.csv
+python $SCRIPTPATH/vatk.py combine $AV_INPUT $AV_INPUT.$BUILD* > $AV_INPUT.combo.csv
 #perl $SCRIPTPATH/vcfCSVFix.pl $AV_INPUT.combo.csv > $AV_INPUT.combo.txt
 
 # Create genome summary combo file
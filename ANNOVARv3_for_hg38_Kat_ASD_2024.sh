@@ -45,6 +45,7 @@ echo "# $0 A script to annotate variants using ANNOVAR
 # 15/03/2019; Mark Corbett; Remove Eye gene list and replace with CP gene bed file.
 # 11/06/2019; Ali Gardner; Updated some databases in Annovar
 # 02/06/2020; Ali Gardner; Updated for use with hg38 vcfs
+# 19/10/2026; Mark Corbett; Run annovar_combine_csv.py through vatk.py
 " 
 }
 
@@ -126,7 +127,7 @@ perl $AnnovarPATH/annotate_variation.pl -regionanno -buildver $BUILD -dbtype pLI
 perl $AnnovarPATH/annotate_variation.pl -regionanno -buildver $BUILD -dbtype Zscore --colsWanted 4 $AV_INPUT $AV_DB >> $1.pipeline.log 2>&1
 
 # Combine all variant files
-python $SCRIPTPATH/annovar_combine_csv.py $AV_INPUT $AV_INPUT.$BUILD* > $AV_INPUT.combo.csv
+python $SCRIPTPATH/vatk.py combine $AV_INPUT $AV_INPUT.$BUILD* > $AV_INPUT.combo.csv
 #perl $SCRIPTPATH/vcfCSVFix.pl $AV_INPUT.combo.csv > $AV_INPUT.combo.txt
 
 # Create genome summary combo file
@@ -1,7 +1,6 @@
 #!/usr/bin/python3
 
 # Script to filter affected family members for matched genotypes in a multisample ANNOVAR file
-import pandas as pd
 import sys, getopt, csv
 
 def usage():
@@ -16,6 +15,8 @@ def usage():
 # Options:
 # -i           /path/to/inputFile    REQUIRED: A multisample ANNOVAR table in tab delimited format
 # -s           /path/to/sampleFile   OPTIONAL: A list of specific samples to extract. By default all samples are assumed affected and this might not be what you want
+# -z           gzip|zstd             OPTIONAL: Compress the output tables with gzip or zstd (uses pigz or zstd if installed)
+# -t           threads               OPTIONAL: Threads shared by the table writers and pigz or zstd.  Default is 2
 # -h | --help  Displays help                 OPTIONAL: Displays usage information.
 #
 # Script created by Mark Corbett on 15/08/2019
@@ -24,11 +25,15 @@ def usage():
 # Ali Gardner; 21/01/2021; Tweak to use with hg38 (no UK10, Wellderley, Exac.ro.1.filtered), change Func.gene to Func.refGene
 # Thomas Litster; 27/04.2022; Added clinvar search (Will search for clinvar variants in all samples provided, even if variant is not shared)
 # Mark Corbett; 06/12/2023; Add in phased genotypes
+# Mark Corbett; 19/10/2026; Import pandas after reading the arguments so the script can run quickly from vatk.py
+# Mark Corbett; 19/10/2026; Write tables in the background with vatkOutput.py and add -z compression and -t writer threads
 '''
          )
 
 # Set initial values
 inputFile = ''
+compression = ''
+threads = 2
 sampleFile = ''
 geneTerms = ['exonic', 'splicing', 'UTR5', 'ncRNA_exonic', 'ncRNA_splicing']
 notGeneTerms = ['downstream', 'intergenic', 'intronic', 'ncRNA_exonic', 'ncRNA_intronic', 'ncRNA_splicing', 'ncRNA_UTR3', 'ncRNA_UTR5', 'upstream', 'UTR3', 'UTR5']
@@ -40,7 +45,7 @@ pathogenicFilter = ['Pathogenic', 'Likely_pathogenic']
 nullAlelles = ['0/0', '0\|0', '\./\.']
 # Read command line arguments
 try:
-    opts, args = getopt.getopt(sys.argv[1:],'hi:s:',['help'])
+    opts, args = getopt.getopt(sys.argv[1:],'hi:s:z:t:',['help'])
 except getopt.GetoptError:
     usage
     sys.exit(2)
@@ -52,12 +57,30 @@ for opt, arg in opts:
         inputFile = arg
     elif opt in ("-s"):
         sampleFile = arg
+    elif opt in ("-z"):
+        compression = arg
+    elif opt in ("-t"):
+        threads = int(arg)
 
 # Make sure you have what you need
 if inputFile == '':
     usage()
     print('Hey, you forgot to tell me which ANNOVAR file to filter\n')
     sys.exit(2)    
+if compression not in ['', 'gzip', 'zstd']:
+    usage()
+    print('Hey, I can only compress the output with -z gzip or -z zstd\n')
+    sys.exit(2)
+if threads < 1:
+    usage()
+    print('Hey, -t needs at least 1 thread to write the output\n')
+    sys.exit(2)
+
+# Only import the heavy modules once the arguments are good so -h and usage errors stay fast
+import pandas as pd
+from vatkOutput import TableWriter
+
+writer = TableWriter(compression=compression, threads=threads)
 
 # Count the number of columns in the ANNOVAR table
 with open(inputFile) as f:
@@ -81,7 +104,7 @@ for s in samples: # Maybe this loop could be an apply function?
     homList=currentSampleList[currentSampleList[s].str.match(pat = '(1/1)|(1\|1)')]
     dfCore = pd.concat([dfCore,homList], axis=1, join='inner') # Add , sort='False' once Ubuntu is upgraded
 
-dfCore.to_csv("ibdAndXl."+inputFile, sep='\t')
+writer.write(dfCore, "ibdAndXl."+inputFile)
 
 #Generic filters for most likely pathogenic
 dfCore=dfCore[dfCore['FILTER'].isin(filterTerms)]
@@ -90,11 +113,11 @@ dfCore=dfCore[(dfCore[filter0001].apply(pd.to_numeric, errors='coerce').fillna(0
 
 #BestGeneCandidates
 bgc=dfCore[dfCore['Func.refGene'].isin(geneTerms)]
-bgc.to_csv("ibdAndXl.BestGeneCandidates."+inputFile, sep='\t')
+writer.write(bgc, "ibdAndXl.BestGeneCandidates."+inputFile)
 
 # Cadidates to test with spliceAI
 spliceCandidates=dfCore[dfCore['Func.refGene'].isin(ncSpliceTerms)]
-spliceCandidates.to_csv("ibdAndXl.SpliceCandidates."+inputFile, sep='\t')
+writer.write(spliceCandidates, "ibdAndXl.SpliceCandidates."+inputFile)
 
 # Reset and repeat for het calls
 dfCore=coreTable 
@@ -103,18 +126,18 @@ for s in samples:
     homList=currentSampleList[currentSampleList[s].str.match(pat = '(0/1)|(0\|1)|(1\|0)')]
     dfCore = pd.concat([dfCore,homList], axis=1, join='inner') # Add , sort='False' once Ubuntu is upgraded
 
-dfCore.to_csv("het."+inputFile, sep='\t')
+writer.write(dfCore, "het."+inputFile)
 dfCore=dfCore[dfCore['FILTER'].isin(filterTerms)]
 dfCore=dfCore[(dfCore[filter005].apply(pd.to_numeric, errors='coerce').fillna(0).lt(0.005)).all(axis=1)]
 dfCore=dfCore[(dfCore[filter0001].apply(pd.to_numeric, errors='coerce').fillna(0).lt(0.0001)).all(axis=1)]
 
 #BestGeneCandidates
 bgc=dfCore[dfCore['Func.refGene'].isin(geneTerms)]
-bgc.to_csv("het.BestGeneCandidates."+inputFile, sep='\t')
+writer.write(bgc, "het.BestGeneCandidates."+inputFile)
 
 # Find cadidates to test with spliceAI
 spliceCandidates=dfCore[dfCore['Func.refGene'].isin(ncSpliceTerms)]
-spliceCandidates.to_csv("het.SpliceCandidates."+inputFile, sep='\t')
+writer.write(spliceCandidates, "het.SpliceCandidates."+inputFile)
 
 # Find any ClinVar variants
 SampleStr=''
@@ -124,4 +147,5 @@ for s in samples:
     SampleStr = SampleStr + s + "_"
 
 cvList=ANNOVARtable[eval(CLNSIGStr[:-3]) & ANNOVARtable['CLNSIG'].str.contains('|'.join(pathogenicFilter))]
-cvList.to_csv(SampleStr+"clinVar."+inputFile, sep='\t')
+writer.write(cvList, SampleStr+"clinVar."+inputFile)
+writer.close()
@@ -1,8 +1,7 @@
 #!/usr/bin/python3
 
 # Script to filter parents for recessive and X-linked genotypes from in a multisample ANNOVAR file
-import pandas as pd
-import sys, getopt, csv
+import sys, getopt, csv, os
 
 def usage():
     print(
@@ -10,24 +9,39 @@ def usage():
 # preConceptionTesting.py a script to filter affected family members for matched genotypes in a multisample ANNOVAR file
 # also outputting a BestGeneCandidates file.
 #
-# Usage preConceptionTesting.py -i ANNOVAR.table.txt -s sampleList.txt | [ -h | --help ]
+# Usage preConceptionTesting.py -i ANNOVAR.table.txt -m mother_ID -f father_ID | [ -h | --help ]
+#       preConceptionTesting.py -i ANNOVAR.table.txt -p coupleList.txt [-a] [-g /path/to/matrixPrefix] | [ -h | --help ]
 #
 # Options:
 # -i           /path/to/inputFile    REQUIRED: A multisample ANNOVAR table in tab delimited format
-# -m           mother_ID   REQUIRED: The ID of the mother's sample as listed in the ANNOVAR table
-# -f           father_ID   REQUIRED: The ID of the father's sample as listed in the ANNOVAR table
-# -h | --help  Displays help                 OPTIONAL: Displays usage information.
+# -m           mother_ID             REQUIRED: The ID of the mother's sample as listed in the ANNOVAR table
+# -f           father_ID             REQUIRED: The ID of the father's sample as listed in the ANNOVAR table
+# -p           /path/to/coupleFile   OPTIONAL: Screen many couples in one run instead of -m and -f.  A tab delimited file
+#                                              with one mother_ID and father_ID pair per line.  Tables are written as
+#                                              mother_ID_father_ID.<screen>.inputFile and only keep the annotation
+#                                              columns plus the mother's and father's genotype columns
+# -a           all pairings          OPTIONAL: Default is FALSE.  Screen every mother in the couple file against every father.  Needs -p
+# -g           /path/to/matrixPrefix OPTIONAL: Save the bit packed genotype matrix to matrixPrefix.genotypes.npy, .masks.npy
+#                                              and .info.txt and memory map it on later runs of the same table.  Needs -p
+# -z           gzip|zstd             OPTIONAL: Compress the output tables with gzip or zstd (uses pigz or zstd if installed)
+# -t           threads               OPTIONAL: Threads shared by the table writers and pigz or zstd.  Default is 2
+# -h | --help  Displays help         OPTIONAL: Displays usage information.
 #
 # Script created by Mark Corbett on 20/12/2019
 # Contact: mark.corbett at adelaide.edu dot au
 # Edit History (Name; Date; Description)
 # Mark Corbett; 06/12/2023; Add in pahsed genotypes and update ANNOVAR field names
+# Mark Corbett; 19/10/2026; Add cohort mode screening many couples from a bit packed genotype matrix. Fix the clinVar sample lookup
+# Mark Corbett; 19/10/2026; Import pandas after reading the arguments so the script can run quickly from vatk.py
+# Mark Corbett; 19/10/2026; Write tables in the background with vatkOutput.py and add -z compression and -t writer threads
 #
 '''
          )
 
 # Set initial values
 inputFile = ''
+compression = ''
+threads = 2
 sampleFile = ''
 geneTerms = ['exonic', 'splicing', 'UTR5', 'ncRNA_exonic', 'ncRNA_splicing']
 notGeneTerms = ['downstream', 'intergenic', 'intronic', 'ncRNA_exonic', 'ncRNA_intronic', 'ncRNA_splicing', 'ncRNA_UTR3', 'ncRNA_UTR5', 'upstream', 'UTR3', 'UTR5']
@@ -37,9 +51,14 @@ filter005 = ['esp6500siv2_all', '1000g2015aug_all']
 filter0001 = ['exac03', 'gnomad211_exome', 'gnomad312_genome', 'AF']
 pathogenicFilter = ['Pathogenic', 'Likely_pathogenic']
 nullAlelles = ['0/0', '0\|0', '\./\.']
+mumID = ''
+dadID = ''
+coupleFile = ''
+allPairings = False
+matrixPrefix = ''
 # Read command line arguments
 try:
-    opts, args = getopt.getopt(sys.argv[1:],'hi:m:f:',['help'])
+    opts, args = getopt.getopt(sys.argv[1:],'hi:m:f:p:ag:z:t:',['help'])
 except getopt.GetoptError:
     usage
     sys.exit(2)
@@ -53,12 +72,56 @@ for opt, arg in opts:
         mumID = arg
     elif opt in ("-f"):
         dadID = arg
+    elif opt in ("-p"):
+        coupleFile = arg
+    elif opt in ("-a"):
+        allPairings = True
+    elif opt in ("-g"):
+        matrixPrefix = arg
+    elif opt in ("-z"):
+        compression = arg
+    elif opt in ("-t"):
+        threads = int(arg)
 
 # Make sure you have what you need
 if inputFile == '':
     usage()
     print('Hey, you forgot to tell me which ANNOVAR file to filter\n')
     sys.exit(2)
+if coupleFile == '' and (mumID == '' or dadID == ''):
+    usage()
+    print('Hey, you forgot to tell me which couple to screen, use -m and -f or a couple file with -p\n')
+    sys.exit(2)
+if coupleFile == '' and (allPairings or matrixPrefix != ''):
+    usage()
+    print('Hey, -a and -g only work when screening a couple file given with -p\n')
+    sys.exit(2)
+if coupleFile != '':
+    if not os.path.exists(coupleFile):
+        usage()
+        print('Hey, I can\'t find the couple file '+coupleFile+'\n')
+        sys.exit(2)
+    couples=[line.split() for line in open(coupleFile) if line.strip() != '']
+    badLines=[' '.join(c) for c in couples if len(c) != 2]
+    if len(couples) == 0 or len(badLines) > 0:
+        usage()
+        print('Hey, every line of the couple file needs exactly one mother_ID and one father_ID separated by a tab: '+' | '.join(badLines)+'\n')
+        sys.exit(2)
+if compression not in ['', 'gzip', 'zstd']:
+    usage()
+    print('Hey, I can only compress the output with -z gzip or -z zstd\n')
+    sys.exit(2)
+if threads < 1:
+    usage()
+    print('Hey, -t needs at least 1 thread to write the output\n')
+    sys.exit(2)
+
+# Only import the heavy modules once the arguments are good so -h and usage errors stay fast
+import pandas as pd
+import numpy as np
+from vatkOutput import TableWriter
+
+writer = TableWriter(compression=compression, threads=threads)
 
 # Create the filter function
 def bestGeneCandidatesFilter(df):
@@ -68,6 +131,98 @@ def bestGeneCandidatesFilter(df):
     df=df[~df['Func.gene'].isin(notGeneTerms)]
     return df
 
+# Cohort mode helpers. Each sample's genotypes are packed 2 bits per variant as a low and a high bit plane
+# of 64 bit words: 00 = null (0/0, 0|0, ./.), 01 = het, 10 = hom alt, 11 = any other call (e.g. 1/2)
+def packBits(mask):
+    bits=np.packbits(np.asarray(mask, dtype=bool), bitorder='little')
+    bits=np.pad(bits, (0, -len(bits) % 8)) # Pad to a whole number of 64 bit words
+    return bits.view(np.uint64)
+
+def unpackBits(words, numVariants):
+    return np.flatnonzero(np.unpackbits(words.view(np.uint8), count=numVariants, bitorder='little'))
+
+def encodeGenotypes(gt):
+    het=gt.str.match(pat = '(0/1)|(0\|1)|(1\|0)').fillna(False).to_numpy(dtype=bool)
+    hom=gt.str.match(pat = '(1/1)|(1\|1)').fillna(False).to_numpy(dtype=bool) & ~het
+    null=(gt.str.contains('|'.join(nullAlelles)).fillna(True).to_numpy(dtype=bool)) & ~het & ~hom
+    other=~(het | hom | null)
+    return packBits(het | other), packBits(hom | other)
+
+def matrixInfo(sampleNames):
+    # Identify the ANNOVAR table a saved matrix was built from by its size, mtime and sample columns
+    return [str(os.path.getsize(inputFile)), repr(os.path.getmtime(inputFile))] + sampleNames
+
+def loadGenotypeMatrix(df, sampleNames, numWords):
+    # Memory map a previously saved matrix if it was built from this exact ANNOVAR table
+    shape=(len(sampleNames), 2, numWords)
+    if matrixPrefix != '':
+        gtFile=matrixPrefix+".genotypes.npy"
+        maskFile=matrixPrefix+".masks.npy"
+        infoFile=matrixPrefix+".info.txt"
+        if os.path.exists(gtFile) and os.path.exists(maskFile) and os.path.exists(infoFile):
+            savedInfo=[line.rstrip('\n') for line in open(infoFile)]
+            gtMatrix=np.load(gtFile, mmap_mode='r')
+            masks=np.load(maskFile, mmap_mode='r')
+            if savedInfo == matrixInfo(sampleNames) and gtMatrix.shape == shape and masks.shape == (3, numWords):
+                print('INFO: Using the genotype matrix saved in '+gtFile+'\n')
+                return gtMatrix, masks
+            print('INFO: The genotype matrix saved in '+gtFile+' does not match '+inputFile+', rebuilding it\n')
+        if os.path.exists(infoFile):
+            os.remove(infoFile) # The info file marks a finished matrix so remove it before rebuilding
+        # Build into temporary files so an interrupted run never leaves a matrix that looks finished
+        gtMatrix=np.lib.format.open_memmap(gtFile+".tmp", mode='w+', dtype=np.uint64, shape=shape)
+        masks=np.lib.format.open_memmap(maskFile+".tmp", mode='w+', dtype=np.uint64, shape=(3, numWords))
+    else:
+        gtMatrix=np.zeros(shape, dtype=np.uint64)
+        masks=np.zeros((3, numWords), dtype=np.uint64)
+    for i, s in enumerate(sampleNames):
+        gtMatrix[i, 0], gtMatrix[i, 1] = encodeGenotypes(df[s])
+    # Precompute the variant masks shared by every couple: rare candidates, ClinVar pathogenic and chrX
+    candidates=np.zeros(len(df), dtype=bool)
+    candidates[bestGeneCandidatesFilter(df=df.reset_index(drop=True)).index]=True
+    masks[0]=packBits(candidates)
+    masks[1]=packBits(df['CLNSIG'].str.contains('|'.join(pathogenicFilter), na=False))
+    masks[2]=packBits(df['chr'].str.contains("X", na=False))
+    if matrixPrefix != '':
+        gtMatrix.flush()
+        masks.flush()
+        os.replace(gtFile+".tmp", gtFile)
+        os.replace(maskFile+".tmp", maskFile)
+        with open(infoFile+".tmp", 'w') as f:
+            f.write('\n'.join(matrixInfo(sampleNames))+'\n')
+        os.replace(infoFile+".tmp", infoFile)
+    return gtMatrix, masks
+
+def pairCouples(couples):
+    # With -a every mother is paired with every father in the couple file
+    if not allPairings:
+        return couples
+    mothers=list(dict.fromkeys(c[0] for c in couples))
+    fathers=list(dict.fromkeys(c[1] for c in couples))
+    return [[m, f] for m in mothers for f in fathers]
+
+def screenCouple(mum, dad, gtMatrix, masks, geneCodes, numVariants):
+    mumLo, mumHi = gtMatrix[mum]
+    dadLo, dadHi = gtMatrix[dad]
+    mumHet=mumLo & ~mumHi
+    dadHet=dadLo & ~dadHi
+    mNotfHets=mumHet & ~dadLo & ~dadHi
+    fNotmHets=dadHet & ~mumLo & ~mumHi
+    sharedHets=mumHet & dadHet
+    calls={}
+    calls['allSharedHetCalls']=unpackBits(sharedHets, numVariants)
+    calls['allSharedHetCalls.BestGeneCandidates']=unpackBits(sharedHets & masks[0], numVariants)
+    # Compound het genes need a filtered variant from each parent
+    mCandidates=unpackBits(mNotfHets & masks[0], numVariants)
+    fCandidates=unpackBits(fNotmHets & masks[0], numVariants)
+    chGenes=np.intersect1d(geneCodes[mCandidates], geneCodes[fCandidates])
+    chGenes=chGenes[chGenes >= 0] # Variants without a gene name can't be compound hets
+    compHets=np.union1d(mCandidates, fCandidates)
+    calls['allcompHetCalls.BestGeneCandidates']=compHets[np.isin(geneCodes[compHets], chGenes)]
+    calls['allX-linked.BestGeneCandidates']=unpackBits(mNotfHets & masks[0] & masks[2], numVariants)
+    calls['clinVar']=unpackBits((mumLo | mumHi | dadLo | dadHi) & masks[1], numVariants)
+    return calls
+
 # Count the number of columns in the ANNOVAR table
 with open(inputFile) as f:
     reader = csv.reader(f, delimiter='\t', skipinitialspace=True)
@@ -76,14 +231,41 @@ with open(inputFile) as f:
 
 # Open ANNOVAR table with pandas setting the chr-start-ref-obs column as the index
 ANNOVARtable=pd.read_csv(inputFile, sep='\t', index_col = num_cols)
+
+# Cohort mode: build the packed genotype matrix once then screen every couple with bitwise operations
+if coupleFile != '':
+    sampleNames=ANNOVARtable.columns[ANNOVARtable.columns.get_loc("FORMAT")+1:].tolist()
+    coreColumns=ANNOVARtable.columns[:ANNOVARtable.columns.get_loc("FORMAT")+1].tolist()
+    couples=pairCouples(couples)
+    missing=sorted(set(s for c in couples for s in c) - set(sampleNames))
+    if len(missing) > 0:
+        print('Hey, these samples from the couple file are not in the ANNOVAR table: '+' '.join(missing)+'\n')
+        sys.exit(2)
+    numVariants=len(ANNOVARtable)
+    numWords=-(-numVariants // 64)
+    if matrixPrefix == '':
+        matrixSamples=sorted(set(s for c in couples for s in c)) # Only encode the samples being screened
+    else:
+        matrixSamples=sampleNames # A saved matrix covers the whole table so it can be reused for any couple
+    gtMatrix, masks = loadGenotypeMatrix(df=ANNOVARtable, sampleNames=matrixSamples, numWords=numWords)
+    sampleRows={s: i for i, s in enumerate(matrixSamples)}
+    geneCodes=pd.factorize(ANNOVARtable['Gene.refGene'])[0]
+    print('INFO: Screening '+str(len(couples))+' couples\n')
+    for mumID, dadID in couples:
+        calls=screenCouple(mum=sampleRows[mumID], dad=sampleRows[dadID], gtMatrix=gtMatrix, masks=masks, geneCodes=geneCodes, numVariants=numVariants)
+        for callType, rows in calls.items():
+            writer.write(ANNOVARtable[coreColumns + [mumID, dadID]].iloc[rows], mumID+"_"+dadID+"."+callType+"."+inputFile)
+    writer.close()
+    sys.exit()
+
 samples = [mumID, dadID]
 
 hetList=ANNOVARtable[ANNOVARtable[samples[0]].str.match(pat = '(0/1)|(0\|1)|(1\|0)') & ANNOVARtable[samples[1]].str.match(pat = '(0/1)|(0\|1)|(1\|0)')]
-hetList.to_csv("allSharedHetCalls."+inputFile, sep='\t')
+writer.write(hetList, "allSharedHetCalls."+inputFile)
 
 #Generic filters for most likely pathogenic
 hetList=bestGeneCandidatesFilter(df=hetList)
-hetList.to_csv("allSharedHetCalls.BestGeneCandidates."+inputFile, sep='\t')
+writer.write(hetList, "allSharedHetCalls.BestGeneCandidates."+inputFile)
 
 # Compound het calls
 mNotfHets=ANNOVARtable[ANNOVARtable[samples[0]].str.match(pat = '(0/1)|(0\|1)|(1\|0)') & ANNOVARtable[samples[1]].str.contains('|'.join(nullAlelles))]
@@ -104,12 +286,13 @@ chGenes=seriesCHgenes[seriesCHgenes.duplicated()]
 compHets=compHets[compHets['Gene.refGene'].isin(chGenes)]
 compHets=bestGeneCandidatesFilter(df=compHets)
 compHets=compHets[compHets['Gene.refGene'].duplicated(keep=False)]  # Re-run the gene filter after the other filters
-compHets.to_csv("allcompHetCalls.BestGeneCandidates."+inputFile, sep='\t')
+writer.write(compHets, "allcompHetCalls.BestGeneCandidates."+inputFile)
 
 # X-linked
 xList=filtmNotfHets[filtmNotfHets['chr'].str.contains("X", na=False)]
-xList.to_csv("allX-linked.BestGeneCandidates."+inputFile, sep='\t')
+writer.write(xList, "allX-linked.BestGeneCandidates."+inputFile)
 
 # ClinVar
-cvList=ANNOVARtable[~ANNOVARtable[samples[0,1]].str.contains('|'.join(nullAlelles)) & ANNOVARtable['CLNSIG'].str.contains('|'.join(pathogenicFilter))]
-cvList.to_csv("clinVar."+inputFile, sep='\t')
+cvList=ANNOVARtable[(~ANNOVARtable[samples[0]].str.contains('|'.join(nullAlelles)) | ~ANNOVARtable[samples[1]].str.contains('|'.join(nullAlelles))) & ANNOVARtable['CLNSIG'].str.contains('|'.join(pathogenicFilter))]
+writer.write(cvList, "clinVar."+inputFile)
+writer.close()
@@ -1,7 +1,6 @@
 #!/usr/bin/python3
 
 # Script to split multisample ANNOVAR file
-import pandas as pd
 import sys, getopt, csv
 
 def usage():
@@ -17,23 +16,29 @@ def usage():
 # -i           /path/to/inputFile    REQUIRED: A multisample ANNOVAR table in tab delimited format
 # -s           /path/to/sampleFile   OPTIONAL: A list of specific samples to extract. By default all samples are split into new files
 # -k           keep reference calls  OPTIONAL: Default is FALSE.  Add this key if you want to keep 0/0 genotypes
+# -z           gzip|zstd             OPTIONAL: Compress the output tables with gzip or zstd (uses pigz or zstd if installed)
+# -t           threads               OPTIONAL: Threads shared by the table writers and pigz or zstd.  Default is 2
 # -h | --help  Displays help                 OPTIONAL: Displays usage information.
 #
 # Script created by Mark Corbett on 14/03/2019
 # Contact: mark.corbett at adelaide.edu dot au
 # Edit History (Name; Date; Description)
+# Mark Corbett; 19/10/2026; Import pandas after reading the arguments so the script can run quickly from vatk.py
+# Mark Corbett; 19/10/2026; Write tables in the background with vatkOutput.py and add -z compression and -t writer threads
 #
 '''
          )
 
 # Set initial values
 inputFile = ''
+compression = ''
+threads = 2
 sampleFile = ''
 keepRefs = False
 
 # Read command line arguments
 try:
-    opts, args = getopt.getopt(sys.argv[1:],'hi:s:k',['help'])
+    opts, args = getopt.getopt(sys.argv[1:],'hi:s:kz:t:',['help'])
 except getopt.GetoptError:
     usage
     sys.exit(2)
@@ -47,12 +52,30 @@ for opt, arg in opts:
         sampleFile = arg
     elif opt in ("-k"):
         keepRefs = True
+    elif opt in ("-z"):
+        compression = arg
+    elif opt in ("-t"):
+        threads = int(arg)
 
 # Make sure you have what you need
 if inputFile == '':
     usage()
     print('Hey, you forgot to tell me which ANNOVAR file to split\n')
     sys.exit(2)    
+if compression not in ['', 'gzip', 'zstd']:
+    usage()
+    print('Hey, I can only compress the output with -z gzip or -z zstd\n')
+    sys.exit(2)
+if threads < 1:
+    usage()
+    print('Hey, -t needs at least 1 thread to write the output\n')
+    sys.exit(2)
+
+# Only import the heavy modules once the arguments are good so -h and usage errors stay fast
+import pandas as pd
+from vatkOutput import TableWriter
+
+writer = TableWriter(compression=compression, threads=threads)
 
 # Count the number of columns in the ANNOVAR table
 with open(inputFile) as f:
@@ -77,16 +100,17 @@ for s in samples:
         output = pd.concat([coreTable,currentSampleList], axis=1, join='inner') # Add , sort='False' once Ubuntu is upgraded
     elif keepRefs == True :
         output = pd.concat([coreTable,currentSampleList], axis=1, join='inner') # Add , sort='False' once Ubuntu is upgraded
-    output.to_csv(s+".GenomeAnnotationsCombined.txt", sep='\t')
+    writer.write(output, s+".GenomeAnnotationsCombined.txt")
+writer.close()
 
 # Output some shell commands that can be cut and pasted into a script or directly to the shell to reorganise the files if needed
-print('INFO: You may need to run the following shell commands to sort your tables:\n')
-print('for id in ' + ' '.join(samples[0:]) + ' ; do')
-print('(')
-print('sed \'s,\\([^\\t]*\\) *\\(.*\\),\\2\\t\\1,\' $id.GenomeAnnotationsCombined.txt | sed \'s,^\\t,,g\' | head -n1 > $id.header.txt')
-print('sed \'1d\' $id.GenomeAnnotationsCombined.txt | sed \'s,\\([^\\t]*\\) *\\(.*\\),\\2\\t\\1,\' | sed \'s,^\\t,,g\' | sort -k1,1 -k2,2n >> $id.header.txt')
-print('mv $id.header.txt $id.GenomeAnnotationsCombined.txt')
-print(') &')
-print('done')
-print('wait\n')
-
+if compression == '':
+    print('INFO: You may need to run the following shell commands to sort your tables:\n')
+    print('for id in ' + ' '.join(samples[0:]) + ' ; do')
+    print('(')
+    print('sed \'s,\\([^\\t]*\\) *\\(.*\\),\\2\\t\\1,\' $id.GenomeAnnotationsCombined.txt | sed \'s,^\\t,,g\' | head -n1 > $id.header.txt')
+    print('sed \'1d\' $id.GenomeAnnotationsCombined.txt | sed \'s,\\([^\\t]*\\) *\\(.*\\),\\2\\t\\1,\' | sed \'s,^\\t,,g\' | sort -k1,1 -k2,2n >> $id.header.txt')
+    print('mv $id.header.txt $id.GenomeAnnotationsCombined.txt')
+    print(') &')
+    print('done')
+    print('wait\n')
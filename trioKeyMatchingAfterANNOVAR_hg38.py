@@ -1,7 +1,6 @@
 #!/usr/bin/python3
 
 # Script to filter trios for rare possibly disease causing alleles in the child, covers IBD, comp het, X-linked, autosomal dominant and clinVar flagged genotypes from a multisample ANNOVAR file
-import pandas as pd
 import sys, getopt, csv
 
 def usage():
@@ -18,6 +17,8 @@ def usage():
 # -c           child_ID              REQUIRED: The ID of the affected child's sample as listed in the ANNOVAR table
 # -m           mother_ID             REQUIRED: The ID of the mother's sample as listed in the ANNOVAR table
 # -f           father_ID             REQUIRED: The ID of the father's sample as listed in the ANNOVAR table
+# -z           gzip|zstd             OPTIONAL: Compress the output tables with gzip or zstd (uses pigz or zstd if installed)
+# -t           threads               OPTIONAL: Threads shared by the table writers and pigz or zstd.  Default is 2
 # -h | --help  Displays help         OPTIONAL: Displays usage information.
 #
 # Script created by Mark Corbett on 20/12/2019
@@ -25,12 +26,16 @@ def usage():
 # Edit History (Date; Name; Description)
 # 08/12/2021; Mark; Add gnomADv3 geneotypes AF column to the 0.0001 filter list. Fix Gene.refGene. Change best gene candidate filter to whitelist.
 # Mark Corbett; 06/12/2023; Add in phased genotypes
+# Mark Corbett; 19/10/2026; Import pandas after reading the arguments so the script can run quickly from vatk.py
+# Mark Corbett; 19/10/2026; Write tables in the background with vatkOutput.py and add -z compression and -t writer threads
 #
 '''
          )
 
 # Set initial values
 inputFile = ''
+compression = ''
+threads = 2
 geneTerms = ['exonic', 'splicing', 'UTR5', 'ncRNA_exonic', 'ncRNA_splicing']
 notGeneTerms = ['downstream', 'intergenic', 'intronic', 'ncRNA_exonic', 'ncRNA_intronic', 'ncRNA_splicing', 'ncRNA_UTR3', 'ncRNA_UTR5', 'upstream', 'UTR3', 'UTR5']
 filterTerms = ['.', 'PASS']
@@ -42,7 +47,7 @@ nullAlelles = ['0/0', '0\|0', '\./\.']
 
 # Read command line arguments
 try:
-    opts, args = getopt.getopt(sys.argv[1:],'hi:c:m:f:',['help'])
+    opts, args = getopt.getopt(sys.argv[1:],'hi:c:m:f:z:t:',['help'])
 except getopt.GetoptError:
     usage
     sys.exit(2)
@@ -58,12 +63,30 @@ for opt, arg in opts:
         mumID = arg
     elif opt in ("-f"):
         dadID = arg
+    elif opt in ("-z"):
+        compression = arg
+    elif opt in ("-t"):
+        threads = int(arg)
 
 # Make sure you have what you need
 if inputFile == '':
     usage()
     print('Hey, you forgot to tell me which ANNOVAR file to filter\n')
     sys.exit(2)
+if compression not in ['', 'gzip', 'zstd']:
+    usage()
+    print('Hey, I can only compress the output with -z gzip or -z zstd\n')
+    sys.exit(2)
+if threads < 1:
+    usage()
+    print('Hey, -t needs at least 1 thread to write the output\n')
+    sys.exit(2)
+
+# Only import the heavy modules once the arguments are good so -h and usage errors stay fast
+import pandas as pd
+from vatkOutput import TableWriter
+
+writer = TableWriter(compression=compression, threads=threads)
 
 # Create the filter function
 def bestGeneCandidatesFilter(df):
@@ -85,19 +108,19 @@ samples = [mumID, dadID, childID]
 
 # de novo
 dnList=ANNOVARtable[ANNOVARtable[samples[0]].str.contains('|'.join(nullAlelles)) & ANNOVARtable[samples[1]].str.contains('|'.join(nullAlelles)) & ANNOVARtable[samples[2]].str.match(pat = '(0/1)|(0\|1)|(1\|0)')]
-dnList.to_csv(childID+".dn."+inputFile, sep='\t')
+writer.write(dnList, childID+".dn."+inputFile)
 spliceCandidates=dnList[dnList['Func.refGene'].isin(ncSpliceTerms)]
-spliceCandidates.to_csv(childID+".dn.SpliceCandidates."+inputFile, sep='\t')
+writer.write(spliceCandidates, childID+".dn.SpliceCandidates."+inputFile)
 dnList=bestGeneCandidatesFilter(df=dnList)
-dnList.to_csv(childID+".dn.BestGeneCandidates."+inputFile, sep='\t')
+writer.write(dnList, childID+".dn.BestGeneCandidates."+inputFile)
 
 # AR, identical by descent and X-linked 
 homList=ANNOVARtable[~ANNOVARtable[samples[0]].str.match(pat = '(1/1)|(1\|1)') & ~ANNOVARtable[samples[1]].str.match(pat = '(1/1)|(1\|1)') & ANNOVARtable[samples[2]].str.match(pat = '(1/1)|(1\|1)')]
-homList.to_csv(childID+".ibdAndXl."+inputFile, sep='\t')
+writer.write(homList, childID+".ibdAndXl."+inputFile)
 spliceCandidates=homList[homList['Func.refGene'].isin(ncSpliceTerms)]
-spliceCandidates.to_csv(childID+".ibdAndXl.SpliceCandidates."+inputFile, sep='\t')
+writer.write(spliceCandidates, childID+".ibdAndXl.SpliceCandidates."+inputFile)
 homList=bestGeneCandidatesFilter(df=homList)
-homList.to_csv(childID+".ibdAndXl.BestGeneCandidates."+inputFile, sep='\t')
+writer.write(homList, childID+".ibdAndXl.BestGeneCandidates."+inputFile)
 
 # Compound het calls
 mNotfHets=ANNOVARtable[ANNOVARtable[samples[0]].str.match(pat = '(0/1)|(0\|1)|(1\|0)') & ANNOVARtable[samples[1]].str.contains('|'.join(nullAlelles)) & ANNOVARtable[samples[2]].str.match(pat = '(0/1)|(0\|1)|(1\|0)')]
@@ -116,21 +139,22 @@ fGenes=pd.unique(filtfNotmHets['Gene.refGene'])
 seriesCHgenes=pd.Series(mGenes.tolist() + fGenes.tolist())
 chGenes=seriesCHgenes[seriesCHgenes.duplicated()]
 compHets=compHets[compHets['Gene.refGene'].isin(chGenes)]
-compHets.to_csv(childID+".ch."+inputFile, sep='\t')
+writer.write(compHets, childID+".ch."+inputFile)
 spliceCandidates=compHets[compHets['Func.refGene'].isin(ncSpliceTerms)]
-spliceCandidates.to_csv(childID+".ch.SpliceCandidates."+inputFile, sep='\t')
+writer.write(spliceCandidates, childID+".ch.SpliceCandidates."+inputFile)
 compHets=bestGeneCandidatesFilter(df=compHets)
 compHets=compHets[compHets['Gene.refGene'].duplicated(keep=False)]  # Re-run the gene filter after the other filters
-compHets.to_csv(childID+".ch.BestGeneCandidates."+inputFile, sep='\t')
+writer.write(compHets, childID+".ch.BestGeneCandidates."+inputFile)
 
 # AD
 hetList=ANNOVARtable[ANNOVARtable[samples[2]].str.match(pat = '(0/1)|(0\|1)|(1\|0)')]
 #hetList.to_csv("allHets."+inputFile, sep='\t') #Not likely to be worth writing out
 spliceCandidates=hetList[hetList['Func.refGene'].isin(ncSpliceTerms)]
-spliceCandidates.to_csv(childID+".allHets.SpliceCandidates."+inputFile, sep='\t')
+writer.write(spliceCandidates, childID+".allHets.SpliceCandidates."+inputFile)
 hetList=bestGeneCandidatesFilter(df=hetList)
-hetList.to_csv(childID+".allHets.BestGeneCandidates."+inputFile, sep='\t')
+writer.write(hetList, childID+".allHets.BestGeneCandidates."+inputFile)
 
 # ClinVar
 cvList=ANNOVARtable[~ANNOVARtable[samples[2]].str.contains('|'.join(nullAlelles)) & ANNOVARtable['CLNSIG'].str.contains('|'.join(pathogenicFilter))]
-cvList.to_csv(childID+".clinVar."+inputFile, sep='\t')
+writer.write(cvList, childID+".clinVar."+inputFile)
+writer.close()
@@ -0,0 +1,131 @@
+#!/usr/bin/python3
+
+'''
+vatk.py a single entry point for the VariantAnnotationToolkit python scripts.
+Subcommands run the scripts in this process and heavy modules such as pandas are only imported
+once a subcommand needs them, so a batch of invocations shares one warm interpreter.
+
+Created on 19/10/2026
+
+@author: Mark Corbett
+'''
+
+import os
+import runpy
+import shlex
+import sys
+import traceback
+from contextlib import redirect_stdout
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+
+SUBCOMMANDS = {
+    "combine": "annovar_combine_csv.py",
+    "split": "splitMultiANNOVAR.py",
+    "trio": "trioKeyMatchingAfterANNOVAR_hg38.py",
+    "family": "familyKeyMatchingAfterANNOVAR_hg38.py",
+    "preconception": "preConceptionTesting.py",
+    "contrast": "vcfContrastSplit.py",
+    "hgvs": os.path.join("utilities", "annovar2hgvs.py"),
+}
+
+def usage():
+    print(
+'''
+# vatk.py a single entry point for the VariantAnnotationToolkit python scripts
+#
+# Usage vatk.py <subcommand> [subcommand options] | [ -h | --help ]
+#       vatk.py batch /path/to/commandFile
+#
+# Subcommands:
+# combine        annovar_combine_csv.py
+# split          splitMultiANNOVAR.py
+# trio           trioKeyMatchingAfterANNOVAR_hg38.py
+# family         familyKeyMatchingAfterANNOVAR_hg38.py
+# preconception  preConceptionTesting.py
+# contrast       vcfContrastSplit.py
+# hgvs           utilities/annovar2hgvs.py
+# batch          Run one subcommand per line of commandFile in this process, e.g. "split -i table.txt -s DNA1.txt".
+#                A line can end with "> /path/to/file" or ">/path/to/file" to save what the subcommand prints.  Lines starting with # are skipped
+#
+# Use vatk.py <subcommand> -h for the options of each subcommand.
+#
+# Script created by Mark Corbett on 19/10/2026
+# Contact: mark.corbett at adelaide.edu dot au
+# Edit History (Name; Date; Description)
+#
+'''
+         )
+
+def runSubcommand(argv):
+    '''Runs one subcommand with its arguments and returns the exit status it finished with.'''
+    if len(argv) == 0 or argv[0] not in SUBCOMMANDS:
+        usage()
+        return 2
+    script = os.path.join(SCRIPT_DIR, SUBCOMMANDS[argv[0]])
+    savedArgv = sys.argv
+    sys.argv = [script] + argv[1:]
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        if isinstance(e.code, int):
+            return e.code
+        print(e.code, file=sys.stderr)
+        return 1
+    finally:
+        sys.argv = savedArgv
+    return 0
+
+def splitRedirect(argv):
+    '''Takes a trailing "> file", ">file" or "args>file" off a batch line and returns (argv, file or None).'''
+    if len(argv) > 2 and argv[-2] == ">":
+        return argv[:-2], argv[-1]
+    if ">" in argv[-1]:
+        arg, outputFile = argv[-1].rsplit(">", 1)
+        return (argv[:-1] + [arg] if arg != '' else argv[:-1]), outputFile
+    return argv, None
+
+def runBatch(commandFile):
+    failed = 0
+    with open(commandFile) as f:
+        for lineNumber, line in enumerate(f, 1):
+            argv = shlex.split(line, comments=True)
+            if len(argv) == 0:
+                continue
+            argv, outputFile = splitRedirect(argv)
+            if outputFile == '':
+                print("ERROR: line %d of %s has a > without a file name" % (lineNumber, commandFile), file=sys.stderr)
+                failed += 1
+                continue
+            if argv[0] == "batch":
+                print("ERROR: line %d of %s, batch files can't run other batch files" % (lineNumber, commandFile), file=sys.stderr)
+                failed += 1
+                continue
+            try:
+                if outputFile is None:
+                    status = runSubcommand(argv)
+                else:
+                    with open(outputFile, "w") as out, redirect_stdout(out):
+                        status = runSubcommand(argv)
+            except Exception:
+                traceback.print_exc() # Report the failure and carry on with the rest of the batch
+                status = 1
+            if status != 0:
+                print("ERROR: line %d of %s exited with status %s" % (lineNumber, commandFile, status), file=sys.stderr)
+                failed += 1
+    return 1 if failed > 0 else 0
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] in ("-h", "--help"):
+        usage()
+        sys.exit()
+    if sys.argv[1] == "batch":
+        if len(sys.argv) != 3:
+            usage()
+            print('Hey, you forgot to tell me which file of commands to run\n')
+            sys.exit(2)
+        sys.exit(runBatch(sys.argv[2]))
+    sys.exit(runSubcommand(sys.argv[1:]))
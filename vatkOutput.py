@@ -0,0 +1,90 @@
+#!/usr/bin/python3
+
+'''
+vatkOutput.py shared output writer for the VariantAnnotationToolkit filter scripts.
+Tables are written by a pool of background threads while the script carries on filtering, optionally through
+pigz or zstd so the compression is multithreaded too.  A bounded number of pending tables caps memory use.
+
+Created on 19/10/2026
+
+@author: Mark Corbett
+'''
+
+import io
+import os
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+EXTENSIONS = {"gzip": ".gz", "zstd": ".zst"}
+COMPRESSORS = {"gzip": ["pigz", "-c", "-p", "%d"], "zstd": ["zstd", "-q", "-c", "-T%d"]}
+
+class TableWriter:
+    '''Writes DataFrames to tab delimited files in the background.  Call close() to wait for the last files.'''
+
+    def __init__(self, compression='', threads=2, maxPending=None):
+        if compression not in [''] + list(EXTENSIONS):
+            raise ValueError("Unknown compression '%s', use gzip or zstd" % compression)
+        self.compression = compression
+        self.command = None
+        writers = threads
+        if compression != '' and shutil.which(COMPRESSORS[compression][0]) is not None:
+            # Share the thread budget between the writers and the threads of each pigz or zstd process
+            writers = min(threads, 2)
+            compressorThreads = max(1, threads // writers)
+            self.command = [a % compressorThreads if '%d' in a else a for a in COMPRESSORS[compression]]
+        elif compression == 'zstd':
+            try:
+                import zstandard # pandas needs this to write zstd without the zstd command
+            except ImportError:
+                raise ValueError("zstd compression needs the zstd command or the zstandard python package") from None
+        self.pool = ThreadPoolExecutor(max_workers=writers)
+        self.slots = threading.BoundedSemaphore(maxPending if maxPending is not None else writers * 2)
+        self.futures = []
+
+    def write(self, df, fileName, **kwargs):
+        '''Queues df to be written to fileName (plus a .gz or .zst extension) and returns the final file name.'''
+        kwargs.setdefault('sep', '\t')
+        if self.compression != '':
+            fileName += EXTENSIONS[self.compression]
+        self.slots.acquire() # Wait here if too many tables are already queued
+        future = self.pool.submit(self._write, df, fileName, kwargs)
+        future.add_done_callback(lambda f: self.slots.release())
+        self.futures.append(future)
+        return fileName
+
+    def _write(self, df, fileName, kwargs):
+        # Write to a temporary name so a failed write never leaves a truncated table behind
+        tmpName = fileName + ".tmp"
+        try:
+            if self.command is None:
+                df.to_csv(tmpName, compression=self.compression if self.compression != '' else None, **kwargs)
+            else:
+                with open(tmpName, 'wb') as out:
+                    compressor = subprocess.Popen(self.command, stdin=subprocess.PIPE, stdout=out)
+                    try:
+                        with io.TextIOWrapper(compressor.stdin, encoding='utf-8', newline='') as pipe:
+                            df.to_csv(pipe, **kwargs)
+                    except BrokenPipeError:
+                        pass # The compressor stopped early, its exit status below says why
+                    if compressor.wait() != 0:
+                        raise OSError("%s exited with status %d writing '%s'" % (self.command[0], compressor.returncode, fileName))
+            os.replace(tmpName, fileName)
+        except BaseException:
+            if os.path.exists(tmpName):
+                os.remove(tmpName)
+            raise
+
+    def close(self):
+        '''Waits for every queued table and raises the first error from any of them.'''
+        self.pool.shutdown(wait=True)
+        for future in self.futures:
+            future.result()
+        self.futures = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,288 @@
+#!/usr/bin/python3
+
+'''
+vcfContrastSplit.py a streaming replacement for vcf-contrast -n followed by one GATK SelectVariants per sample.
+Reads the (optionally bgzipped) multisample VCF once, keeps sites where any affected sample has a genotype or allele
+not seen in any control sample and writes the contrast VCF plus a single sample VCF for every affected and extra sample.
+
+Created on 19/10/2026
+
+@author: Mark Corbett
+'''
+
+import collections
+import getopt
+import gzip
+import itertools
+import multiprocessing
+import os
+import re
+import sys
+
+GT_SPLIT = re.compile("[/|]")
+BATCH_SIZE = 10000
+
+NOVELTY_HEADER = [
+    '##INFO=<ID=NOVELAL,Number=.,Type=String,Description="List of samples with novel alleles">\n',
+    '##INFO=<ID=NOVELGT,Number=.,Type=String,Description="List of samples with novel genotypes">\n',
+    '##INFO=<ID=NOVELTY,Number=1,Type=Integer,Description="Number of affected samples with a novel genotype or allele">\n',
+]
+
+def usage():
+    print(
+'''
+# vcfContrastSplit.py a streaming replacement for "vcf-contrast -n +affected -controls" followed by
+# VCFSplitWithGATKv4_hg38.sh for each sample.  The VCF is read once and all single sample VCFs are written together.
+#
+# Usage vcfContrastSplit.py -i joint.vcf.gz -a DNA1,DNA2 -c controlList.txt -o FAMILY.common.vcf [-e DNA3] [-d minDP] [-f] [-t threads] | [ -h | --help ]
+#
+# Options:
+# -i           /path/to/VCF          REQUIRED: A multisample VCF, it can be bgzipped with .gz extension
+# -a           list,of,affected      REQUIRED: Samples that you would list under + in vcf-contrast
+# -c           /path/to/controlFile  REQUIRED: Samples you would list under - in vcf-contrast, separated by commas or new lines
+# -o           FAMILY.common.vcf     REQUIRED: Name of the contrast VCF.  Single sample VCFs are written as SAMPLE.FAMILY.common.vcf
+# -e           list,of,extras        OPTIONAL: Control samples to also write single sample VCFs for
+# -d           minDP                 OPTIONAL: Skip sites where any affected or control sample has depth below minDP
+# -f           apply filters         OPTIONAL: Skip sites with FILTER other than PASS or "."
+# -t           threads               OPTIONAL: Number of worker processes to evaluate the contrast.  Default is 1
+# -h | --help  Displays help         OPTIONAL: Displays usage information.
+#
+# Script created by Mark Corbett on 19/10/2026
+# Contact: mark.corbett at adelaide.edu dot au
+# Edit History (Name; Date; Description)
+#
+'''
+         )
+
+def openVCF(fileName):
+    if fileName.endswith(".gz"):
+        return gzip.open(fileName, "rt")
+    return open(fileName)
+
+def readSampleList(text):
+    return [s for s in re.split(r"[,\s]+", text) if s != '']
+
+def parseAlleles(sampleField, gtIndex):
+    gt = sampleField.split(':')[gtIndex]
+    alleles = GT_SPLIT.split(gt)
+    if all(al == '.' for al in alleles):
+        return None # Missing genotypes are neither novel nor background, partial calls like ./1 are kept
+    if len(alleles) == 1:
+        alleles = alleles * 2 # Treat haploid calls as homozygous diploid like vcf-contrast
+    return tuple(sorted(alleles))
+
+def belowMinDP(fields, samples, formatKeys, minDP):
+    dpIndex = formatKeys.index('DP') if 'DP' in formatKeys else None
+    for s in samples:
+        values = fields[s].split(':')
+        if dpIndex is None or dpIndex >= len(values) or not values[dpIndex].isdigit() or int(values[dpIndex]) < minDP:
+            return True
+    return False
+
+def formatAF(af):
+    # Match the way GATK writes allele frequencies
+    return "%.3f" % af if af < 1 else "%.2f" % af
+
+def sampleChromosomeCounts(info, gt, numAlts):
+    '''Rewrites AC, AN and AF in INFO for one sample's genotype like SelectVariants does.'''
+    alleles = [al for al in GT_SPLIT.split(gt) if al != '.']
+    ac = [alleles.count(str(k)) for k in range(1, numAlts + 1)]
+    counts = {
+        'AC': ','.join(str(c) for c in ac),
+        'AN': str(len(alleles)),
+        'AF': ','.join(formatAF(c / len(alleles)) for c in ac),
+    }
+    entries = info.split(';')
+    for k, entry in enumerate(entries):
+        key = entry.split('=', 1)[0]
+        if key in counts:
+            entries[k] = key + '=' + counts[key]
+    return ';'.join(entries)
+
+def contrastRecord(line, affected, controls, annotate, minDP, applyFilters):
+    '''Returns the annotated record, its first 7 columns, its FORMAT column and (index, INFO, sample field)
+    for annotated samples carrying a non-reference allele, or None.'''
+    fields = line.rstrip('\n').split('\t')
+    if applyFilters and fields[6] not in ('PASS', '.'):
+        return None
+    formatKeys = fields[8].split(':')
+    if 'GT' not in formatKeys:
+        return None
+    gtIndex = formatKeys.index('GT')
+
+    if minDP is not None and belowMinDP(fields, controls + [a for a, name in affected], formatKeys, minDP):
+        return None
+
+    bgGenotypes = set()
+    bgAlleles = set()
+    for c in controls:
+        alleles = parseAlleles(fields[c], gtIndex)
+        if alleles is None:
+            continue
+        bgGenotypes.add(alleles)
+        bgAlleles.update(al for al in alleles if al != '.')
+
+    novelGT = []
+    novelAL = []
+    for a, name in affected:
+        alleles = parseAlleles(fields[a], gtIndex)
+        if alleles is None:
+            continue
+        if alleles not in bgGenotypes:
+            novelGT.append(name)
+        if not bgAlleles.issuperset(al for al in alleles if al != '.'):
+            novelAL.append(name)
+    if len(novelGT) == 0 and len(novelAL) == 0:
+        return None
+
+    info = []
+    if len(novelAL) > 0:
+        info.append("NOVELAL=" + ','.join(novelAL))
+    if len(novelGT) > 0:
+        info.append("NOVELGT=" + ','.join(novelGT))
+    info.append("NOVELTY=" + str(len(set(novelGT) | set(novelAL))))
+    if fields[7] not in ('', '.'):
+        info.insert(0, fields[7])
+    fields[7] = ';'.join(info)
+
+    carriers = []
+    numAlts = len(fields[4].split(','))
+    for i, s in enumerate(annotate):
+        alleles = parseAlleles(fields[s], gtIndex)
+        if alleles is not None and any(al not in ('0', '.') for al in alleles):
+            # Same as SelectVariants --exclude-non-variants, with AC/AN/AF counted for this sample only
+            info = sampleChromosomeCounts(fields[7], fields[s].split(':')[gtIndex], numAlts)
+            carriers.append((i, info, fields[s]))
+    # Send back strings rather than the field list so the parent doesn't unpickle every column again
+    return '\t'.join(fields) + '\n', '\t'.join(fields[:7]) + '\t', '\t' + fields[8] + '\t', carriers
+
+def contrastBatch(lines):
+    return [contrastRecord(line, *workerArgs) for line in lines]
+
+def boundedImap(pool, batches, maxPending):
+    '''Like Pool.imap in VCF order, but with at most maxPending batches in flight so memory stays bounded.'''
+    pending = collections.deque()
+    for batch in batches:
+        pending.append(pool.apply_async(contrastBatch, (batch,)))
+        if len(pending) >= maxPending:
+            yield pending.popleft().get()
+    while len(pending) > 0:
+        yield pending.popleft().get()
+
+def initWorker(*args):
+    global workerArgs
+    workerArgs = args
+
+def readHeader(vcf, inputFile):
+    meta = []
+    for line in vcf:
+        if line.startswith("##"):
+            meta.append(line)
+            continue
+        return meta, line.rstrip('\n').split('\t')
+    raise ValueError("'%s' has no #CHROM header line" % inputFile)
+
+def vcfContrastSplit(inputFile, affectedIDs, controlIDs, extraIDs, outputFile, minDP, applyFilters, threads):
+    vcf = openVCF(inputFile)
+    meta, header = readHeader(vcf, inputFile)
+    annotateIDs = affectedIDs + [s for s in extraIDs if s not in affectedIDs]
+    affected = [(header.index(s), s) for s in affectedIDs]
+    controls = [header.index(s) for s in controlIDs]
+    annotate = [header.index(s) for s in annotateIDs]
+
+    meta.extend(NOVELTY_HEADER)
+    meta.append("##vcfContrastSplitCommand=" + ' '.join(sys.argv) + "\n")
+    outDir, outName = os.path.split(outputFile)
+    common = open(outputFile, "w")
+    common.writelines(meta)
+    common.write('\t'.join(header) + '\n')
+    sampleFiles = []
+    for s in annotateIDs:
+        f = open(os.path.join(outDir, s + "." + outName), "w")
+        f.writelines(meta)
+        f.write('\t'.join(header[:9] + [s]) + '\n')
+        sampleFiles.append(f)
+
+    args = (affected, controls, annotate, minDP, applyFilters)
+    batches = iter(lambda: list(itertools.islice(vcf, BATCH_SIZE)), [])
+    if threads > 1:
+        pool = multiprocessing.Pool(threads, initializer=initWorker, initargs=args)
+        results = boundedImap(pool, batches, threads * 2)
+    else:
+        initWorker(*args)
+        results = map(contrastBatch, batches)
+
+    for batch in results:
+        for record in batch:
+            if record is None:
+                continue
+            line, site, formatColumn, carriers = record
+            common.write(line)
+            for i, info, sampleField in carriers:
+                sampleFiles[i].write(site + info + formatColumn + sampleField + '\n')
+
+    if threads > 1:
+        pool.close()
+        pool.join()
+    vcf.close()
+    common.close()
+    for f in sampleFiles:
+        f.close()
+
+
+if __name__ == '__main__':
+    # Set initial values
+    inputFile = ''
+    affectedIDs = []
+    controlIDs = []
+    extraIDs = []
+    outputFile = ''
+    minDP = None
+    applyFilters = False
+    threads = 1
+
+    # Read command line arguments
+    try:
+        opts, args = getopt.getopt(sys.argv[1:],'hi:a:c:e:o:d:ft:',['help'])
+    except getopt.GetoptError:
+        usage()
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt in ("-h", "--help"):
+            usage()
+            sys.exit()
+        elif opt in ("-i"):
+            inputFile = arg
+        elif opt in ("-a"):
+            affectedIDs = readSampleList(arg)
+        elif opt in ("-c"):
+            controlIDs = readSampleList(open(arg).read())
+        elif opt in ("-e"):
+            extraIDs = readSampleList(arg)
+        elif opt in ("-o"):
+            outputFile = arg
+        elif opt in ("-d"):
+            minDP = int(arg)
+        elif opt in ("-f"):
+            applyFilters = True
+        elif opt in ("-t"):
+            threads = int(arg)
+
+    # Make sure you have what you need
+    if inputFile == '' or outputFile == '':
+        usage()
+        print('Hey, you forgot to tell me which VCF to read or what to call the output\n')
+        sys.exit(2)
+    if len(affectedIDs) == 0 or len(controlIDs) == 0:
+        usage()
+        print('Hey, you forgot to tell me which samples are affected and which are controls\n')
+        sys.exit(2)
+    with openVCF(inputFile) as vcf:
+        meta, header = readHeader(vcf, inputFile)
+    missing = [s for s in affectedIDs + controlIDs + extraIDs if s not in header[9:]]
+    if len(missing) > 0:
+        usage()
+        print('Hey, these samples are not in ' + inputFile + ': ' + ' '.join(missing) + '\n')
+        sys.exit(2)
+
+    vcfContrastSplit(inputFile, affectedIDs, controlIDs, extraIDs, outputFile, minDP, applyFilters, threads)
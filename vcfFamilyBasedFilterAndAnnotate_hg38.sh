@@ -3,7 +3,7 @@ usage ()
 {
 echo "# For processing VCFs and doing some intial filtering of variants
 # Requires:
-# gnu parallel, vcftools
+# gnu parallel, python3
 # Example:
 # $0 -f SMITH -i ~/MyVCF/Folder -v MyVcf -a DNA1,DNA2 -c ~/MyFolder/ControlList.csv [-e DNA3] | [-h | --help]
 # 
@@ -23,6 +23,7 @@ echo "# For processing VCFs and doing some intial filtering of variants
 # 03/02/2015; Mark Corbett; Update to put in strict variant filter
 # 15/09/2015; Mark Corbett; Parallelize variant annotation for loop
 # 21/01/2021; Ali Gardner; change columns & values for filtering line 126 awk as no UK10K or Wellderly, now gnomad_exome & genome
+# 19/10/2026; Mark Corbett; Replace vcf-contrast and per sample GATK SelectVariants with a single pass of vcfContrastSplit.py
 #
 "
 }
@@ -98,11 +99,11 @@ fi
 ## Start script ##
 
 cd $famDir
-vcf-contrast -n +$Affected -$Controls $inputDir/$VCF > $Family.common.vcf
+# Contrast affected against controls and write every single sample VCF in one pass of the joint VCF
+~/Documents/Scripts/gitHub/VariantAnnotationToolkit/vcfContrastSplit.py -i $inputDir/$VCF -a $Affected -c $ControlFile -e $(echo $arrAnnotate | tr " " ",") -o $Family.common.vcf
 for Sample in $arrAnnotate; do
 	( 
 	mkdir $Sample
-	~/Documents/Scripts/gitHub/VariantAnnotationToolkit/VCFSplitWithGATKv4_hg38.sh $Family.common.vcf $Sample
 	mv $Sample.$Family.common.* $famDir/$Sample/
 	cd $Sample
 	~/Documents/Scripts/gitHub/VariantAnnotationToolkit/ANNOVARv3_for_hg38.sh $Sample.$Family.common.vcf